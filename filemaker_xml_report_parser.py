@@ -1,41 +1,146 @@
+import os
+import re
+import mmap
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 import pandas as pd
-from typing import List, Tuple
+from typing import List, Tuple, NamedTuple, Optional
 import pandas as pd
 import lxml.etree as ET
 
 
 # from filemaker_xml_report_parser import FileMakerXMLReportParser
 
+# Start/End tags of a DDR (skips CDATA, comments, declarations)
+_TAG_RE = re.compile(
+    rb'<!\[CDATA\[.*?\]\]>|<!--.*?-->|<[?!][^>]*>'
+    rb'|<(/?)([^\s/>]+)(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(/?)>',
+    re.S
+)
+
+
+def _rows_to_df(rows: List[dict], dtypes: dict, columns: List[str] = None, extra_columns=True) -> pd.DataFrame:
+    """Create DataFrame from list of dicts with documented columns and set dtypes
+
+    Documented columns are always present (also for empty lists, e.g. a script
+    without steps), so empty and non-empty DataFrames have the same columns.
+    Other XML attributes found in rows are kept after them (if extra_columns).
+    """
+    columns = columns or []
+    df = pd.DataFrame(rows)
+
+    # Documented columns missing in rows (object, as XML attributes)
+    missing = {col: object for col in columns if col not in df}
+
+    extra = [col for col in df.columns if col not in columns] if extra_columns else []
+    df = df.reindex(columns=[*columns, *extra])
+
+    return df.astype({**missing, **{col: dtype for col, dtype in dtypes.items() if col in df}})
+
+
+def _concat_batches(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate DataFrames parsed in batches with the dtypes of a single parse"""
+
+    df = pd.concat(dfs, ignore_index=True)
+
+    # Columns missing in some batches come out as object, re-infer them
+    cols = [col for col in df.columns if df[col].dtype == object and df[col].notna().any()]
+    return df.astype({col: df[col].infer_objects().dtype for col in cols})
+
+
+# Key attributes, always read when projecting columns
+_KEY_ATTRIBS = ('id', 'name', 'table')
+
+
+def _projection(columns: List[str], *required: str) -> Tuple[str, ...]:
+    """XML attributes to read for columns (None reads all attributes)
+
+    Key attributes (id/name/table) and the required attributes used by the
+    parser logic are always read.
+    """
+    if columns is None:
+        return None
+
+    return tuple(dict.fromkeys([*_KEY_ATTRIBS, *required, *columns]))
+
+
+def _attrib_columns(names: List[str], attribs: Tuple[str, ...]) -> List[str]:
+    """Documented XML attribute columns kept by attribs projection"""
+
+    return [name for name in names if attribs is None or name in attribs]
+
+
+def _attrib_dict(el: ET.Element, attribs: Tuple[str, ...] = None) -> dict:
+    """Element attributes dict (only attribs, if given)"""
+
+    if attribs is None:
+        return dict(el.attrib)
+
+    get = el.get
+    attrib = {}
+
+    for key in attribs:
+        value = get(key)
+        if value is not None:
+            attrib[key] = value
+
+    return attrib
+
+
+def _utf8_mmap(f, xml_file) -> mmap.mmap:
+    """Read-only mmap of an open xml_file (byte scans only support UTF-8 files)"""
+
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mm[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        mm.close()
+        raise ValueError(f"Cannot scan UTF-16 encoded file: {xml_file}")
+
+    return mm
+
+
 class FileMakerXMLReportParser:
 
-    def __init__(self, xml_file):
+    def __init__(self, xml_file, preview=False, preview_objects=100, preview_bytes=None, columns=None,
+                 preview_totals=False):
 
         # print("Holi")
 
         self.xml_file = xml_file
+        self.preview = preview
+
+        if preview:
+            # Partial catalogs (first objects) and optional totals, see parse_preview
+            root, self.df_preview, self.df_preview_base_tables = self.parse_preview(
+                xml_file, preview_objects, preview_bytes, preview_totals)
+        else:
+            tree = ET.parse(xml_file)
+            root = tree.getroot()
 
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
+        # Columns projection {catalog: [XML attributes]} (e.g. {'ScriptCatalog': ['enable']})
+        columns = columns or {}
 
         # BaseTableCatalog {}
         (
             self.df_base_tables,
             self.df_fields,
             self.df_calculated_fields
-        ) = self.parse_base_table_catalog(root)
+        ) = self.parse_base_table_catalog(root, columns.get('BaseTableCatalog'))
 
         # RelationshipGraph {}
         (
             self.df_tables,
             self.df_rels,
             self.df_field_joins
-        ) = self.parse_relationship_graph(root)
+        ) = self.parse_relationship_graph(root, columns.get('RelationshipGraph'))
 
         # LayoutCatalog {}
         (
             self.df_layouts,
             self.df_layout_fields
-        ) = self.parse_layout_catalog(root)
+        ) = self.parse_layout_catalog(root, columns.get('LayoutCatalog'))
 
         # ScriptCatalog {}
         (
@@ -43,20 +148,87 @@ class FileMakerXMLReportParser:
             self.df_script_steps,
             self.df_script_fields,
             self.df_script_layouts,
-            self.df_script_scripts) = self.parse_script_catalog(root)
+            self.df_script_scripts) = self.parse_script_catalog(root, columns.get('ScriptCatalog'))
 
         # ExternalDataSourcesCatalog
-        self.df_files = self.parse_external_data_sources_catalog(root)
+        self.df_files = self.parse_external_data_sources_catalog(root, columns.get('ExternalDataSourcesCatalog'))
 
         # ValueListCatalog {}
         (
             self.df_value_lists,
             self.df_value_lists_fields
-        ) = self.parse_value_list_catalog(root)
+        ) = self.parse_value_list_catalog(root, columns.get('ValueListCatalog'))
+
+    # Catalogs {catalog: (parse method, DataFrames attributes)}, as assigned in __init__
+    CATALOG_FRAMES = {
+        'BaseTableCatalog': (
+            'parse_base_table_catalog',
+            ('df_base_tables', 'df_fields', 'df_calculated_fields')),
+        'RelationshipGraph': (
+            'parse_relationship_graph',
+            ('df_tables', 'df_rels', 'df_field_joins')),
+        'LayoutCatalog': (
+            'parse_layout_catalog',
+            ('df_layouts', 'df_layout_fields')),
+        'ScriptCatalog': (
+            'parse_script_catalog',
+            ('df_scripts', 'df_script_steps', 'df_script_fields', 'df_script_layouts', 'df_script_scripts')),
+        'ExternalDataSourcesCatalog': (
+            'parse_external_data_sources_catalog',
+            ('df_files',)),
+        'ValueListCatalog': (
+            'parse_value_list_catalog',
+            ('df_value_lists', 'df_value_lists_fields')),
+    }
+
+    @classmethod
+    def parse_catalog_frames(cls, catalog: str, root: ET.Element, columns: List[str] = None) -> dict:
+        """Parses root catalog and returns its DataFrames {'df_tables': df_tables, ...}
+
+        columns -> XML attributes to keep (id/name keys are always kept), None keeps all
+        """
+
+        method, attrs = cls.CATALOG_FRAMES[catalog]
+        dfs = getattr(cls, method)(root, columns)
+
+        # parse_external_data_sources_catalog returns a single DataFrame
+        if isinstance(dfs, pd.DataFrame):
+            dfs = (dfs,)
+
+        return dict(zip(attrs, dfs))
+
+    @classmethod
+    def from_frames(cls, xml_file, frames: dict) -> 'FileMakerXMLReportParser':
+        """Creates a parser instance from already parsed DataFrames (see FileMakerXMLReportLoader)"""
+
+        parser = cls.__new__(cls)
+        parser.xml_file = xml_file
+        parser.preview = False
+        parser.__dict__.update(frames)
+
+        return parser
+
+    def memory_usage(self) -> int:
+        """Approximate memory footprint (bytes) of df_* DataFrames"""
+
+        return int(sum(
+            df.memory_usage(deep=True).sum()
+            for attr, df in self.__dict__.items()
+            if attr.startswith('df_') and isinstance(df, pd.DataFrame)
+        ))
+
+    @property
+    def relationship_graph(self) -> 'RelationshipGraph':
+        """Table occurrences graph of df_tables/df_rels/df_field_joins (built once)"""
+
+        if '_relationship_graph' not in self.__dict__:
+            self._relationship_graph = RelationshipGraph(self.df_tables, self.df_rels, self.df_field_joins)
+
+        return self._relationship_graph
 
     # External Data Sources
     @staticmethod
-    def parse_external_data_sources_catalog(root: ET.Element) -> pd.DataFrame:
+    def parse_external_data_sources_catalog(root: ET.Element, columns: List[str] = None) -> pd.DataFrame:
 
         """Parses xml_file ExternalDataSourcesCatalog element
 
@@ -85,8 +257,11 @@ class FileMakerXMLReportParser:
         # Init lists
         files = []
 
+        # Columns projection
+        attribs = _projection(columns)
+
         for file in root.find("File/ExternalDataSourcesCatalog"):
-            file_dict = dict(file.attrib)
+            file_dict = _attrib_dict(file, attribs)
             file_dict['file_id'] = file_dict.pop('id', '')
             file_dict['file_name'] = file_dict.pop('name', '')
 
@@ -95,13 +270,14 @@ class FileMakerXMLReportParser:
         # Create DataFrames
 
         # File scripts
-        df_files = pd.DataFrame(files).astype({'file_id': 'int32'})
+        file_cols = [*_attrib_columns(['pathList'], attribs), 'file_id', 'file_name']
+        df_files = _rows_to_df(files, {'file_id': 'int32'}, file_cols)
 
         return df_files
 
     # Base Tables
     @staticmethod
-    def parse_base_table_catalog(root: ET.Element) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    def parse_base_table_catalog(root: ET.Element, columns: List[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Parses xml_file BaseTableCatalog element:
 
         * Returns
@@ -144,6 +320,7 @@ class FileMakerXMLReportParser:
         - ref_field_id        int32
         - ref_field_name     object
         - ref_table_name     object
+        - ref_count           int32 (occurrences of the reference in the field)
         """
 
         # tree = ET.parse(xml_file)
@@ -153,91 +330,91 @@ class FileMakerXMLReportParser:
         fields = []
         related_fields = []
 
+        # Columns projection
+        attribs = _projection(columns, 'records', 'fieldType')
+
         for base_table_el in root.find(f"File/BaseTableCatalog"):
 
             # BaseTable {'id': '129', 'records': '163151', 'name': 'Compta'}
-            base_table_dict = dict(base_table_el.attrib)
+            base_table_dict = _attrib_dict(base_table_el, attribs)
             base_table_dict['base_table_id'] = base_table_dict.pop('id')
             base_table_dict['base_table_name'] = base_table_dict.pop('name')
             base_tables.append(base_table_dict)
 
             #  {'id': '175', 'dataType': 'Text', 'fieldType': 'Normal', 'name': 'PrimaryKey'}
             for field in base_table_el.findall("FieldCatalog/Field"):
-                field_dict = dict(field.attrib)
+                field_dict = _attrib_dict(field, attribs)
                 field_dict['field_id'] = field_dict.pop('id')
                 field_dict['field_name'] = field_dict.pop('name')
                 field_dict.update(base_table_dict)
                 fields.append(field_dict)
 
-                # Get Fields used in Calculated fields
+                # Reference Fields used in Calculated/Summary fields
                 if field_dict['fieldType'] == 'Calculated':
+                    ref_fields = field.findall("DisplayCalculation/Chunk/Field")
+                elif field_dict['fieldType'] == 'Summary':
+                    ref_fields = field.findall("SummaryInfo/SummaryField/Field")
+                else:
+                    ref_fields = []
+
+                # Dedupe references per field while extracting
+                # {(ref_field_id, ref_table_name): related_field_dict}
+                field_refs = {}
 
-                    # Find All reference Fields
-                    for field in field.findall("DisplayCalculation/Chunk/Field"):
-                        # Update field dict
-                        field_dict.update(dict(field.attrib))
-                        field_dict['ref_field_id'] = field_dict.pop('id')
-                        field_dict['ref_field_name'] = field_dict.pop('name')
-                        field_dict['ref_table_name'] = field_dict.pop('table')
+                for ref_field in ref_fields:
+                    ref_key = (ref_field.get('id'), ref_field.get('table', ''))
 
-                        # Append to list
-                        related_fields.append(field_dict)
+                    if ref_key in field_refs:
+                        field_refs[ref_key]['ref_count'] += 1
+                        continue
 
-                # Get Fields used in Summary fields
-                if field_dict['fieldType'] == 'Summary':
-                    # Find reference Field
-                    field = field.find("SummaryInfo/SummaryField/Field")
+                    # Copy field dict, one row per distinct reference
+                    related_field_dict = field_dict.copy()
+                    related_field_dict['ref_field_id'] = ref_key[0]
+                    related_field_dict['ref_field_name'] = ref_field.get('name')
+                    related_field_dict['ref_table_name'] = ref_key[1]
+                    related_field_dict['ref_count'] = 1
 
-                    # Update field dict
-                    field_dict.update(dict(field.attrib))
-                    field_dict['ref_field_id'] = field_dict.pop('id')
-                    field_dict['ref_field_name'] = field_dict.pop('name')
+                    field_refs[ref_key] = related_field_dict
 
-                    # Append to list
-                    related_fields.append(field_dict)
+                # Append to list
+                related_fields.extend(field_refs.values())
 
-                    # Base Tables DataFrame
-        df_base_tables = pd.DataFrame(base_tables).astype({
+        # Base Tables DataFrame
+        df_base_tables = _rows_to_df(base_tables, {
             'records': 'int32',
             'base_table_id': 'int32'
-        })
-
-        df_base_tables = df_base_tables[['base_table_id', 'base_table_name', 'records']]
+        }, ['base_table_id', 'base_table_name', 'records'], extra_columns=False)
 
         # Fields DataFrame
         field_cols = ['base_table_id', 'base_table_name', 'records',
-                      'field_id', 'field_name', 'dataType', 'fieldType', ]
+                      'field_id', 'field_name', *_attrib_columns(['dataType'], attribs), 'fieldType', ]
 
-        df_fields = pd.DataFrame(fields).astype({
+        df_fields = _rows_to_df(fields, {
             'field_id': 'int32',
             'records': 'int32',
             'base_table_id': 'int32',
-        })[field_cols]
+        }, field_cols, extra_columns=False)
 
         # Calculation/Summary related Fields Data Frame
-        df_calculated_fields = pd.DataFrame(related_fields)
-
-        # GroupBy
-        group_cols = ['field_id', 'base_table_id', 'ref_field_id', 'ref_table_name']
-        df_calculated_fields = df_calculated_fields.groupby(group_cols).first().reset_index()
-
-        rel_fields_cols = ['field_id', 'field_name', 'dataType', 'fieldType',
+        rel_fields_cols = ['field_id', 'field_name', *_attrib_columns(['dataType'], attribs), 'fieldType',
                            'base_table_id', 'base_table_name', 'records',
-                           'ref_field_id', 'ref_field_name', 'ref_table_name']
+                           'ref_field_id', 'ref_field_name', 'ref_table_name', 'ref_count']
 
-        # Set dtypes
-        df_calculated_fields = df_calculated_fields.astype({
+        # Already deduped while parsing (one row per field/reference)
+        df_calculated_fields = _rows_to_df(related_fields, {
             'field_id': 'int32',
             'records': 'int32',
             'base_table_id': 'int32',
             'ref_field_id': 'int32',
-        })[rel_fields_cols]
+            'ref_count': 'int32',
+        }, rel_fields_cols, extra_columns=False)
 
         return df_base_tables, df_fields, df_calculated_fields
 
     # Relationships and Field Joins
     @staticmethod
-    def parse_relationship_graph(root: ET.Element) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    def parse_relationship_graph(root: ET.Element, columns: List[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Get DataFrame of Relationships and FieldJoins of relationships
 
         * XML structure:
@@ -273,6 +450,8 @@ class FileMakerXMLReportParser:
         - base_table_id       int32
         - base_table_name    object
         - table_name         object
+        - external_file_id   object
+        - external_file_name object
 
         Columns (df_relationships):
         - relationship_id      int32
@@ -285,7 +464,9 @@ class FileMakerXMLReportParser:
         - join_side          object
         - table_name         object
         - field_id            int32
-        - name               object
+        - field_name         object
+        - left_table_name    object
+        - right_table_name   object
         """
 
         # Pares xml_file and get root element
@@ -296,10 +477,13 @@ class FileMakerXMLReportParser:
         relations = []
         field_joins = []
 
+        # Columns projection (baseTable/baseTableId link table occurrences to base tables)
+        attribs = _projection(columns, 'baseTable', 'baseTableId', 'type')
+
         # Get all tables in TableList tag
         for table in root.find(f"File/RelationshipGraph/TableList"):
 
-            table_dict = dict(table.attrib)
+            table_dict = _attrib_dict(table, attribs)
             external = table.find("FileReference")
 
             if external is not None:
@@ -311,10 +495,13 @@ class FileMakerXMLReportParser:
             tables.append(table_dict)
 
         # Convert dtypes
-        df_tables = pd.DataFrame(tables).astype({
+        table_cols = ['id', *_attrib_columns(['color'], attribs), 'baseTableId', 'baseTable', 'name',
+                      'external_file_id', 'external_file_name']
+
+        df_tables = _rows_to_df(tables, {
             'id': 'int32',
             'baseTableId': 'int32'
-        })
+        }, table_cols)
 
         # Rename columns
         df_tables = df_tables.rename(columns={
@@ -336,14 +523,15 @@ class FileMakerXMLReportParser:
             relations.append(relation_dict)
 
             for join in rel.findall("JoinPredicateList/JoinPredicate"):
-                join_dict = dict(join.attrib)
+                join_dict = _attrib_dict(join, attribs)
 
                 for field in join:
-                    field_dict = dict(field.find("Field").attrib)
+                    field_dict = _attrib_dict(field.find("Field"), attribs)
 
                     field_dict['table_name'] = field_dict.pop('table', '')
                     field_dict['field_id'] = field_dict.pop('id', '')
                     field_dict['field_name'] = field_dict.pop('name', '')
+                    field_dict['join_side'] = field.tag
 
                     field_dict.update(join_dict)
                     field_dict.update(relation_dict)
@@ -353,7 +541,8 @@ class FileMakerXMLReportParser:
         # print(field_joins)
 
         # Create Relationships DataFrame
-        df_rels = pd.DataFrame(relations).astype({'relationship_id': 'int32'})
+        df_rels = _rows_to_df(relations, {'relationship_id': 'int32'},
+                              ['relationship_id', 'left_table_name', 'right_table_name'])
 
         # Rename columns
         df_rels = df_rels.rename(columns={
@@ -362,10 +551,13 @@ class FileMakerXMLReportParser:
         })
 
         # Create Field Joins DataFrame
-        df_field_joins = pd.DataFrame(field_joins).astype({
+        field_join_cols = ['relationship_id', 'type', 'join_side', 'table_name', 'field_id', 'field_name',
+                           'left_table_name', 'right_table_name']
+
+        df_field_joins = _rows_to_df(field_joins, {
             'field_id': 'int32',
             'relationship_id': 'int32',
-        })
+        }, field_join_cols)
 
         # Rename columns
         df_field_joins = df_field_joins.rename(columns={
@@ -377,7 +569,7 @@ class FileMakerXMLReportParser:
 
     # Layouts
     @staticmethod
-    def parse_layout_catalog(root: ET.Element) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def parse_layout_catalog(root: ET.Element, columns: List[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Parses xml_file LayoutCatalog element
 
         * Returns:
@@ -428,6 +620,9 @@ class FileMakerXMLReportParser:
         layouts = []
         fields = []
 
+        # Columns projection
+        attribs = _projection(columns)
+
         for layout in root.findall("File/LayoutCatalog/.//Layout"):
             parent = layout.find('..')
             if parent.tag == "LayoutCatalog" or parent.tag == "Group":
@@ -436,7 +631,7 @@ class FileMakerXMLReportParser:
 
                 # Get Assiciated Table
                 table = layout.find("Table").attrib
-                layout_dict = dict(layout.attrib)
+                layout_dict = _attrib_dict(layout, attribs)
 
                 layout_dict['layout_id'] = layout_dict.pop('id')
                 layout_dict['layout_name'] = layout_dict.pop('name')
@@ -461,24 +656,28 @@ class FileMakerXMLReportParser:
                         fields.append(field_dict)
 
                         # Layouts DataFrame
-        cols = ['layout_id', 'layout_name', 'table_id', 'table_name',
-                'width', 'quickFind', 'includeInMenu']
-        df_layouts = pd.DataFrame(layouts).astype({'width': 'int32', 'layout_id': 'int32'})[cols]
+        layout_attrib_cols = _attrib_columns(['width', 'quickFind', 'includeInMenu'], attribs)
+
+        cols = ['layout_id', 'layout_name', 'table_id', 'table_name', *layout_attrib_cols]
+        df_layouts = _rows_to_df(layouts, {'width': 'int32', 'layout_id': 'int32'}, cols, extra_columns=False)
         #  df_layouts = df_layouts.rename(columns={'id': 'layout_id', 'name': 'layout_name'})
 
         # Layout Fileds DataFrame
         # cols = ['layout_id', 'layout_name', 'table_id', 'table_name', 'width', 'quickFind', 'includeInMenu']
-        df_layout_fields = pd.DataFrame(fields).astype({
+        layout_field_cols = [*layout_attrib_cols, 'layout_id', 'layout_name', 'table_id', 'table_name',
+                             'field_table_name', 'field_name']
+
+        df_layout_fields = _rows_to_df(fields, {
             'width': 'int32',
             'layout_id': 'int32',
             'table_id': 'int32'
-        })
+        }, layout_field_cols)
 
         return df_layouts, df_layout_fields
 
     # Scripts
     @staticmethod
-    def parse_script_catalog(root: ET.Element) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    def parse_script_catalog(root: ET.Element, columns: List[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
 
         """Parses xml_file ScriptCatalog element
 
@@ -543,6 +742,8 @@ class FileMakerXMLReportParser:
         Columns (df_script_layouts):
         - layout_id         int32
         - layout_name      object
+        - table_id         object (external layout table)
+        - table_name       object (external layout table)
         - enable           object
         - step_id           int32
         - step_name        object
@@ -575,13 +776,16 @@ class FileMakerXMLReportParser:
         script_layouts = []
         script_scripts = []
 
+        # Columns projection
+        attribs = _projection(columns)
+
         for script in root.findall("File/ScriptCatalog/.//Script"):
             # print(tree.getpath(el)) #el.attrib)
             parent = script.find('..')
 
             if parent.tag == "ScriptCatalog" or parent.tag == "Group":
 
-                script_dict = dict(script.attrib)
+                script_dict = _attrib_dict(script, attribs)
                 script_dict['script_id'] = script_dict.pop('id')
                 script_dict['script_name'] = script_dict.pop('name')
                 scripts.append(script_dict)
@@ -589,7 +793,7 @@ class FileMakerXMLReportParser:
                 #  Get script Steps
                 for step in script.findall("StepList/Step"):
 
-                    step_dict = dict(step.attrib)
+                    step_dict = _attrib_dict(step, attribs)
                     step_dict['step_id'] = step_dict.pop('id')
                     step_dict['step_name'] = step_dict.pop('name')
 
@@ -599,7 +803,7 @@ class FileMakerXMLReportParser:
 
                     # Get fields used in steps
                     for field in step.findall(".//Field"):
-                        field_dict = dict(field.attrib)
+                        field_dict = _attrib_dict(field, attribs)
                         field_dict['table_name'] = field_dict.pop('table', '')
                         field_dict['field_id'] = field_dict.pop('id', '')
                         field_dict['field_name'] = field_dict.pop('name', '')
@@ -616,14 +820,14 @@ class FileMakerXMLReportParser:
                     for layout in step.findall(".//Layout"):
                         if layout.attrib:
 
-                            layout_dict = dict(layout.attrib)
+                            layout_dict = _attrib_dict(layout, attribs)
                             layout_dict['layout_id'] = layout_dict.pop('id', '')
                             layout_dict['layout_name'] = layout_dict.pop('name', '')
 
                             # Find external layout tables
                             table = layout.find('..').find('Table')
                             if table is not None:
-                                table_dict = dict(table.attrib)
+                                table_dict = _attrib_dict(table, attribs)
                                 table_dict['table_id'] = table_dict.pop('id', '')
                                 table_dict['table_name'] = table_dict.pop('name', '')
                                 layout_dict.update(table_dict)
@@ -634,7 +838,7 @@ class FileMakerXMLReportParser:
 
                     # Find used Scripts in scipt steps
                     for sub_script in step.findall(".//Script"):
-                        sub_script_dict = dict(sub_script.attrib)
+                        sub_script_dict = _attrib_dict(sub_script, attribs)
                         sub_script_dict['subscript_id'] = sub_script_dict.pop('id', '')
                         sub_script_dict['suscript_name'] = sub_script_dict.pop('name', '')
 
@@ -644,38 +848,46 @@ class FileMakerXMLReportParser:
 
         # Create DataFrames
 
+        # Documented columns (scripts/steps columns are inherited by steps/references)
+        script_cols = [*_attrib_columns(['includeInMenu', 'runFullAccess'], attribs), 'script_id', 'script_name']
+        step_cols = [*_attrib_columns(['enable'], attribs), 'step_id', 'step_name', *script_cols]
+
         # File scripts
-        df_scripts = pd.DataFrame(scripts).astype({'script_id': 'int32'})
+        df_scripts = _rows_to_df(scripts, {'script_id': 'int32'}, script_cols)
 
         # Steps used in file scripts
-        df_script_steps = pd.DataFrame(script_steps).astype({
+        df_script_steps = _rows_to_df(script_steps, {
             'script_id': 'int32',
-            'step_id': 'int32'})
+            'step_id': 'int32'}, step_cols)
 
         # Fields used in file scripts/steps
-        df_script_fields = pd.DataFrame(script_fields).astype({
+        df_script_fields = _rows_to_df(script_fields, {
             'script_id': 'int32',
             'step_id': 'int32',
-            'field_id': 'int32'})
+            'field_id': 'int32'},
+            ['table_name', 'field_id', 'field_name', *step_cols,
+             *_attrib_columns(['map', 'GroupByFieldIsSelected'], attribs)])
 
         # Layouts used in file scripts/steps
-        df_script_layouts = pd.DataFrame(script_layouts).astype({
+        df_script_layouts = _rows_to_df(script_layouts, {
             'script_id': 'int32',
             'step_id': 'int32',
             # 'table_id': 'int32' (ValueError: cannot convert float NaN to integer)
-            'layout_id': 'int32', })
+            'layout_id': 'int32', },
+            ['layout_id', 'layout_name', 'table_id', 'table_name', *step_cols])
 
         # Scripts used in file scripts/steps
-        df_script_scripts = pd.DataFrame(script_scripts).astype({
+        df_script_scripts = _rows_to_df(script_scripts, {
             'script_id': 'int32',
             'step_id': 'int32',
-            'subscript_id': 'int32'})
+            'subscript_id': 'int32'},
+            ['subscript_id', 'suscript_name', *step_cols])
 
         return df_scripts, df_script_steps, df_script_fields, df_script_layouts, df_script_scripts
 
     # Value List
     @staticmethod
-    def parse_value_list_catalog(root: ET.Element) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def parse_value_list_catalog(root: ET.Element, columns: List[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
 
         """
         ValueListCatalog
@@ -687,12 +899,15 @@ class FileMakerXMLReportParser:
         value_lists = []
         value_list_fields = []
 
+        # Columns projection
+        attribs = _projection(columns, 'value')
+
         for value_list in root.find("File/ValueListCatalog"):
 
-            value_list_dict = dict(value_list.attrib)
+            value_list_dict = _attrib_dict(value_list, attribs)
             value_list_dict['value_list_id'] = value_list_dict.pop('id', '')
             value_list_dict['value_list_name'] = value_list_dict.pop('name', '')
-            value_list_dict.update(value_list[0].attrib)
+            value_list_dict.update(_attrib_dict(value_list[0], attribs))
 
             value_lists.append(value_list_dict)
 
@@ -701,7 +916,7 @@ class FileMakerXMLReportParser:
                 for field in value_list.findall(".//Field"):
                     parent = field.find("..")
 
-                    field_dict = dict(field.attrib)
+                    field_dict = _attrib_dict(field, attribs)
                     field_dict["type"] = parent.tag
 
                     field_dict["table_name"] = field_dict.pop('table', '')
@@ -710,11 +925,445 @@ class FileMakerXMLReportParser:
 
                     value_list_fields.append(field_dict)
 
-        df_value_lists = pd.DataFrame(value_lists).astype({'value_list_id': 'int32'})
-        df_value_lists_fields = pd.DataFrame(value_list_fields).astype({'field_id': 'int32'})
+        df_value_lists = _rows_to_df(value_lists, {'value_list_id': 'int32'},
+                                     ['value_list_id', 'value_list_name', 'value'])
+        df_value_lists_fields = _rows_to_df(value_list_fields, {'field_id': 'int32'},
+                                            ['type', 'table_name', 'field_id', 'field_name'])
 
         return df_value_lists, df_value_lists_fields
 
+    # Catalog Index (byte offsets sidecar)
+    INDEX_SUFFIX = ".index.csv"
+
+    _index_cache = {}
+
+    @staticmethod
+    def _is_catalog_object(stack: List[str], tag: str) -> bool:
+        """Checks if tag (child of stack path) is a top-level catalog object
+
+        '/File/<Catalog>/<Object>'
+        '/File/<Catalog>/Group[]/<Object>'
+        '/File/RelationshipGraph/TableList/Table'
+        '/File/RelationshipGraph/RelationshipList/Relationship'
+        """
+        if len(stack) < 3 or tag == "Group" or stack[1] != "File":
+            return False
+
+        if stack[2] == "RelationshipGraph":
+            return len(stack) == 4 and stack[3] in ("TableList", "RelationshipList")
+
+        return stack[2].endswith("Catalog") and all(t == "Group" for t in stack[3:])
+
+    @classmethod
+    def build_catalog_index(cls, xml_file, index_file=None) -> pd.DataFrame:
+        """Scans xml_file once and writes a sidecar index of catalog objects
+
+        The index is saved as CSV (default: '<xml_file>.index.csv') and allows
+        reading a single Script/Layout/... without parsing the whole DDR
+        (see read_catalog_object, parse_script and parse_layout). Its first
+        line stores xml_file size and mtime, to detect a replaced DDR.
+
+        Only UTF-8 encoded DDR files can be indexed.
+
+
+        * Columns (df_index):
+        ----------------------------------------------------------------------------
+        - catalog      object (BaseTableCatalog, LayoutCatalog, ScriptCatalog...)
+        - tag          object (BaseTable, Layout, Script...)
+        - id            int32
+        - name         object
+        - offset        int64 (byte offset of the object start tag)
+        - length        int64 (bytes up to the end of the object end tag)
+        """
+        index_file = index_file or xml_file + cls.INDEX_SUFFIX
+        stamp = cls._index_stamp(xml_file)
+
+        objects = []
+        stack = []
+
+        # Current object being scanned (depth, offset, catalog, start tag)
+        current = None
+
+        with open(xml_file, 'rb') as f, _utf8_mmap(f, xml_file) as mm:
+
+            for match in _TAG_RE.finditer(mm):
+                closing, tag, self_closing = match.groups()
+
+                # CDATA, comments, declarations
+                if tag is None:
+                    continue
+
+                tag = tag.decode()
+
+                if closing:
+                    stack.pop()
+
+                    if current is not None and len(stack) == current[0]:
+                        objects.append((current, match.end()))
+                        current = None
+
+                    continue
+
+                if current is None and cls._is_catalog_object(stack, tag):
+                    current = (len(stack), match.start(), stack[2], match.group(0))
+
+                    if self_closing:
+                        objects.append((current, match.end()))
+                        current = None
+
+                if not self_closing:
+                    stack.append(tag)
+
+        # Get object attributes from start tags
+        index = []
+        for (_, start, catalog, start_tag), end in objects:
+            if not start_tag.endswith(b'/>'):
+                start_tag = start_tag[:-1] + b'/>'
+
+            el = ET.fromstring(start_tag)
+            index.append({
+                'catalog': catalog,
+                'tag': el.tag,
+                'id': el.get('id', '-1'),
+                'name': el.get('name', ''),
+                'offset': start,
+                'length': end - start,
+            })
+
+        df_index = _rows_to_df(index, {'id': 'int32', 'offset': 'int64', 'length': 'int64'},
+                               ['catalog', 'tag', 'id', 'name', 'offset', 'length'])
+        with open(index_file, 'w', newline='') as f:
+            f.write(stamp + '\n')
+            df_index.to_csv(f, index=False)
+
+        return df_index
+
+    @staticmethod
+    def _index_stamp(xml_file) -> str:
+        """Sidecar index first line, '# <size> <mtime_ns>' of xml_file"""
+
+        stat = os.stat(xml_file)
+        return f"# {stat.st_size} {stat.st_mtime_ns}"
+
+    @classmethod
+    def load_catalog_index(cls, xml_file, index_file=None) -> pd.DataFrame:
+        """Loads xml_file sidecar index, (re)building it if missing or outdated
+
+        The index is outdated when xml_file size or mtime differ from the ones
+        stored in it (also older mtimes, e.g. a DDR restored from a backup).
+        """
+        index_file = index_file or xml_file + cls.INDEX_SUFFIX
+
+        stamp = None
+        if os.path.exists(index_file):
+            with open(index_file) as f:
+                stamp = f.readline().rstrip('\n')
+
+        if stamp != cls._index_stamp(xml_file):
+            cls.build_catalog_index(xml_file, index_file)
+
+        # Cache loaded index until the sidecar file changes
+        mtime = os.path.getmtime(index_file)
+        cached = cls._index_cache.get(index_file)
+
+        if cached is None or cached[0] != mtime:
+            df_index = pd.read_csv(index_file, skiprows=1, keep_default_na=False, dtype={
+                'id': 'int32',
+                'offset': 'int64',
+                'length': 'int64',
+                'name': 'object',
+            })
+            cached = cls._index_cache[index_file] = (mtime, df_index)
+
+        return cached[1]
+
+    @classmethod
+    def read_catalog_object(cls, xml_file, tag, object_id=None, name=None, index_file=None) -> ET.Element:
+        """Reads a single catalog object (Script, Layout, BaseTable...) by id or name
+
+        Seeks to the object byte range of the sidecar index and parses only that
+        XML fragment. Raises ValueError if the fragment does not match the index
+        (tag, id, name), e.g. a DDR rewritten with the same size and mtime.
+        """
+        if object_id is None and name is None:
+            raise ValueError("object_id or name is required")
+
+        df_index = cls.load_catalog_index(xml_file, index_file)
+
+        mask = df_index['tag'] == tag
+        if object_id is not None:
+            mask &= df_index['id'] == int(object_id)
+        if name is not None:
+            mask &= df_index['name'] == name
+
+        df_found = df_index[mask]
+        if df_found.empty:
+            raise KeyError(f"{tag} not found (id={object_id}, name={name})")
+
+        row = df_found.iloc[0]
+
+        with open(xml_file, 'rb') as f:
+            f.seek(row['offset'])
+            fragment = f.read(row['length'])
+
+        try:
+            el = ET.fromstring(fragment)
+        except ET.XMLSyntaxError:
+            el = None
+
+        if el is None or (el.tag, el.get('id', '-1'), el.get('name', '')) != (tag, str(row['id']), row['name']):
+            raise ValueError(f"Outdated catalog index of {xml_file}, rebuild it with build_catalog_index")
+
+        return el
+
+    @staticmethod
+    def _catalog_root(catalog: str, element: ET.Element) -> ET.Element:
+        """Wraps element as '/FMPReport/File/<catalog>/<element>' (parse_*_catalog root)"""
+
+        root = ET.Element("FMPReport")
+        ET.SubElement(ET.SubElement(root, "File"), catalog).append(element)
+
+        return root
+
+    @classmethod
+    def parse_script(cls, xml_file, script_id=None, script_name=None, index_file=None,
+                     columns=None) -> Tuple[pd.DataFrame, ...]:
+        """Parses a single Script of xml_file (see parse_script_catalog)"""
+
+        script = cls.read_catalog_object(xml_file, "Script", script_id, script_name, index_file)
+
+        return cls.parse_script_catalog(cls._catalog_root("ScriptCatalog", script), columns)
+
+    @classmethod
+    def parse_layout(cls, xml_file, layout_id=None, layout_name=None, index_file=None,
+                     columns=None) -> Tuple[pd.DataFrame, ...]:
+        """Parses a single Layout of xml_file (see parse_layout_catalog)"""
+
+        layout = cls.read_catalog_object(xml_file, "Layout", layout_id, layout_name, index_file)
+
+        return cls.parse_layout_catalog(cls._catalog_root("LayoutCatalog", layout), columns)
+
+    # Preview
+    PREVIEW_CATALOGS = {
+        'BaseTableCatalog': ('BaseTable',),
+        'RelationshipGraph': ('Table', 'Relationship'),
+        'LayoutCatalog': ('Layout',),
+        'ScriptCatalog': ('Script',),
+        'ExternalDataSourcesCatalog': ('FileReference',),
+        'ValueListCatalog': ('ValueList',),
+    }
+
+    PREVIEW_CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def _catalog_element(catalog: str, objects: List[ET.Element]) -> ET.Element:
+        """Creates catalog element with objects (TableList/RelationshipList for RelationshipGraph)"""
+
+        catalog_el = ET.Element(catalog)
+
+        if catalog == 'RelationshipGraph':
+            lists = {
+                'Table': ET.SubElement(catalog_el, 'TableList'),
+                'Relationship': ET.SubElement(catalog_el, 'RelationshipList'),
+            }
+            for el in objects:
+                lists[el.tag].append(el)
+        else:
+            catalog_el.extend(objects)
+
+        return catalog_el
+
+    @classmethod
+    def _scan_catalog_ranges(cls, mm: mmap.mmap) -> dict:
+        """Byte range of each parsed catalog {catalog: (start, end)}
+
+        Single forward pass over the '/FMPReport/File' children: each child is
+        skipped up to its end tag, so catalogs are found in file order.
+        """
+        ranges = {}
+
+        # <File name="" path="">
+        pos = mm.find(b'<File')
+        while pos != -1 and mm[pos + 5:pos + 6] not in (b'>', b' '):
+            pos = mm.find(b'<File', pos + 5)
+        if pos == -1:
+            return ranges
+
+        pos = mm.find(b'>', pos) + 1
+
+        while pos > 0:
+            start = mm.find(b'<', pos)
+
+            # </File> (or truncated file)
+            if start == -1 or mm[start + 1:start + 2] == b'/':
+                break
+
+            # Comments, processing instructions
+            if mm[start + 1:start + 4] == b'!--':
+                end = mm.find(b'-->', start)
+                pos = end + 3 if end != -1 else 0
+                continue
+
+            tag_end = mm.find(b'>', start) + 1
+            if tag_end == 0:
+                break
+
+            if mm[start + 1:start + 2] in (b'!', b'?'):
+                pos = tag_end
+                continue
+
+            # <Catalog>, <Catalog attr="">, <Catalog/>
+            tag = re.match(rb'<([^\s/>]+)', mm[start:tag_end]).group(1)
+
+            if mm[tag_end - 2:tag_end] == b'/>':
+                end = tag_end
+            else:
+                end = mm.find(b'</' + tag + b'>', tag_end)
+                if end == -1:
+                    break
+                end += len(tag) + 3
+
+            catalog = tag.decode()
+            if catalog in cls.PREVIEW_CATALOGS:
+                ranges[catalog] = (start, end)
+
+            pos = end
+
+        return ranges
+
+    @classmethod
+    def _preview_catalog(cls, f, catalog, start, end, max_objects, max_bytes) -> List[ET.Element]:
+        """Parses first catalog objects of the (start, end) byte range of file f
+
+        Stops after max_objects complete objects (of each object tag) or
+        max_bytes read bytes.
+        """
+        containers = {catalog, 'Group', 'TableList', 'RelationshipList'}
+
+        # Parsed objects count by tag {'Table': 0, 'Relationship': 0}
+        counts = dict.fromkeys(cls.PREVIEW_CATALOGS[catalog], 0)
+
+        parser = ET.XMLPullParser(events=('end',))
+        objects = []
+
+        f.seek(start)
+        remaining = end - start if max_bytes is None else min(end - start, max_bytes)
+
+        while remaining > 0 and min(counts.values()) < max_objects:
+            chunk = f.read(min(cls.PREVIEW_CHUNK_SIZE, remaining))
+            remaining -= len(chunk)
+            parser.feed(chunk)
+
+            for _, el in parser.read_events():
+                if counts.get(el.tag, max_objects) >= max_objects:
+                    continue
+
+                # Only top-level objects (not referenced Scripts/Layouts of steps)
+                if all(parent.tag in containers for parent in el.iterancestors()):
+                    objects.append(el)
+                    counts[el.tag] += 1
+
+        return objects
+
+    @classmethod
+    def parse_preview(cls, xml_file, max_objects=100, max_bytes=None,
+                      totals=False) -> Tuple[ET.Element, pd.DataFrame, pd.DataFrame]:
+        """Quick look at xml_file, without parsing the whole DDR
+
+        Parses only the first max_objects objects (or max_bytes bytes) of each
+        catalog, after a single scan for the catalogs byte ranges.
+
+        Objects totals (totals=True) are read from the sidecar catalog index
+        (see build_catalog_index), which scans the whole file the first time.
+
+
+        * Returns:
+        ----------------------------------------------------------------------------
+        - root                   -> ET.Element (partial '/FMPReport/File' for parse_*_catalog)
+        - df_preview             -> pd.DataFrame (Catalogs totals)
+        - df_preview_base_tables -> pd.DataFrame (All base tables and records)
+
+
+        * Columns (df_preview):
+        ----------------------------------------------------------------------------
+        - catalog      object
+        - offset        int64 (catalog byte offset)
+        - length        int64 (catalog bytes)
+        - tag          object (BaseTable, Table, Relationship, Layout, Script...)
+        - count         Int32 (top-level objects in catalog, <NA> unless totals)
+        - parsed        int32 (objects parsed in preview)
+
+        Columns (df_preview_base_tables):
+        - base_table_id       int32
+        - base_table_name    object
+        - records             int32
+        """
+        root = ET.Element("FMPReport")
+        file_el = ET.SubElement(root, "File")
+
+        rows = []
+        base_tables = []
+
+        # Top-level objects {(catalog, tag): count}
+        counts = None
+        if totals:
+            counts = cls.load_catalog_index(xml_file).groupby(['catalog', 'tag']).size().to_dict()
+
+        with open(xml_file, 'rb') as f, _utf8_mmap(f, xml_file) as mm:
+            ranges = cls._scan_catalog_ranges(mm)
+
+            for catalog, object_tags in cls.PREVIEW_CATALOGS.items():
+                start, end = ranges.get(catalog, (0, 0))
+
+                objects = cls._preview_catalog(f, catalog, start, end, max_objects, max_bytes)
+
+                # Partial catalog element
+                file_el.append(cls._catalog_element(catalog, objects))
+
+                # Objects by tag
+                for tag in object_tags:
+                    rows.append({
+                        'catalog': catalog,
+                        'offset': start,
+                        'length': end - start,
+                        'tag': tag,
+                        'count': None if counts is None else counts.get((catalog, tag), 0),
+                        'parsed': sum(el.tag == tag for el in objects),
+                    })
+
+            # BaseTable {'id': '129', 'records': '163151', 'name': 'Compta'}
+            start, end = ranges.get('BaseTableCatalog', (0, 0))
+
+            pos = mm.find(b'<BaseTable ', start, end)
+            while pos != -1:
+                tag_end = mm.find(b'>', pos) + 1
+                start_tag = mm[pos:tag_end]
+                if not start_tag.endswith(b'/>'):
+                    start_tag = start_tag[:-1] + b'/>'
+
+                pos = mm.find(b'<BaseTable ', tag_end, end)
+
+                base_table = ET.fromstring(start_tag)
+                base_tables.append({
+                    'base_table_id': base_table.get('id'),
+                    'base_table_name': base_table.get('name'),
+                    'records': base_table.get('records', 0),
+                })
+
+        df_preview = _rows_to_df(rows, {
+            'offset': 'int64',
+            'length': 'int64',
+            'count': 'Int32',
+            'parsed': 'int32',
+        }, ['catalog', 'offset', 'length', 'tag', 'count', 'parsed'])
+
+        df_preview_base_tables = _rows_to_df(base_tables, {
+            'base_table_id': 'int32',
+            'records': 'int32',
+        }, ['base_table_id', 'base_table_name', 'records'], extra_columns=False)
+
+        return root, df_preview, df_preview_base_tables
+
     @staticmethod
     def print_dataframes_description():
 
@@ -812,3 +1461,458 @@ class FileMakerXMLReportParser:
 
         return df_tables, df_field_joins, df_calculated_fields, df_layout_fields, df_script_fields
 
+
+class JoinStep(NamedTuple):
+    """Relationship traversed from a table occurrence to another
+
+    predicates -> (('Compta::ID', 'Equal', 'CLI::CompID'), ...) as defined in
+    the relationship (LeftField, type, RightField).
+    """
+    relationship_id: int
+    from_table_name: str
+    to_table_name: str
+    predicates: Tuple[Tuple[str, str, str], ...]
+
+
+class RelationshipGraph:
+    """Adjacency of table occurrences (df_tables) connected by relationships (df_rels)
+
+    BFS results are cached by source table occurrence, so path queries after the
+    first one for a source are dict lookups.
+
+    * Usage:
+    ----------------------------------------------------------------------------
+    graph = file_report.relationship_graph
+
+    graph.reachable("Compta")             # {'Compta': 0, 'CLI': 1, 'EXT': 2}
+    graph.shortest_path("Compta", "EXT")  # (JoinStep(1, 'Compta', 'CLI', ...), JoinStep(2, 'CLI', 'EXT', ...))
+    """
+
+    def __init__(self, df_tables: pd.DataFrame, df_rels: pd.DataFrame, df_field_joins: pd.DataFrame):
+
+        # {table_name: [(relationship_id, other_table_name)]}
+        self.adjacency = {table_name: [] for table_name in df_tables.get('table_name', [])}
+
+        for rel in df_rels.itertuples(index=False):
+            self.adjacency.setdefault(rel.left_table_name, []).append((rel.relationship_id, rel.right_table_name))
+            self.adjacency.setdefault(rel.right_table_name, []).append((rel.relationship_id, rel.left_table_name))
+
+        # {relationship_id: (('Compta::ID', 'Equal', 'CLI::CompID'), ...)}
+        predicates = {}
+        left_field = None
+
+        # LeftField/RightField rows of each JoinPredicate
+        for join in df_field_joins.itertuples(index=False):
+            field = f"{join.table_name}::{join.field_name}"
+
+            if join.join_side == 'LeftField':
+                left_field = field
+            else:
+                predicates.setdefault(join.relationship_id, []).append((left_field, join.type, field))
+
+        self.predicates = {rel_id: tuple(preds) for rel_id, preds in predicates.items()}
+
+        # {source: (distances, parents)}
+        self._bfs_cache = {}
+
+        # {(source, target): path}
+        self._path_cache = {}
+
+    def _bfs(self, source: str) -> Tuple[dict, dict]:
+        """Distances {table_name: hops} and parents {table_name: (relationship_id, parent)} from source"""
+
+        if source not in self._bfs_cache:
+            if source not in self.adjacency:
+                raise KeyError(f"Table occurrence not found: {source}")
+
+            distances = {source: 0}
+            parents = {}
+            queue = [source]
+
+            # Level by level BFS
+            while queue:
+                next_queue = []
+                for table_name in queue:
+                    for rel_id, other in self.adjacency[table_name]:
+                        if other not in distances:
+                            distances[other] = distances[table_name] + 1
+                            parents[other] = (rel_id, table_name)
+                            next_queue.append(other)
+                queue = next_queue
+
+            self._bfs_cache[source] = (distances, parents)
+
+        return self._bfs_cache[source]
+
+    def reachable(self, source: str) -> dict:
+        """Table occurrences reachable from source {table_name: hops} (copy of the cached BFS)"""
+
+        return dict(self._bfs(source)[0])
+
+    def shortest_path(self, source: str, target: str) -> Optional[Tuple[JoinStep, ...]]:
+        """Relationships (JoinStep) from source to target, None if not connected
+
+        Raises KeyError if source or target is not a table occurrence of the graph.
+        """
+        key = (source, target)
+
+        if key not in self._path_cache:
+            if target not in self.adjacency:
+                raise KeyError(f"Table occurrence not found: {target}")
+
+            distances, parents = self._bfs(source)
+
+            if target not in distances:
+                path = None
+            else:
+                steps = []
+                table_name = target
+                while table_name != source:
+                    rel_id, parent = parents[table_name]
+                    steps.append(JoinStep(rel_id, parent, table_name, self.predicates.get(rel_id, ())))
+                    table_name = parent
+
+                path = tuple(reversed(steps))
+
+            self._path_cache[key] = path
+
+        return self._path_cache[key]
+
+    def paths_from(self, source: str) -> dict:
+        """Shortest paths to every reachable table occurrence {table_name: (JoinStep, ...)}"""
+
+        return {target: self.shortest_path(source, target) for target in self.reachable(source)}
+
+
+class FileMakerXMLReportLoader:
+    """Loads a FileMakerXMLReportParser in a worker thread (asyncio)
+
+    Each catalog is parsed as soon as its XML end tag is read, so its DataFrames
+    are available (frames, wait_catalog, on_catalog) while the rest of the file
+    is still loading.
+
+    * Usage:
+    ----------------------------------------------------------------------------
+    loader = FileMakerXMLReportLoader("path/to/file.xml", on_progress=print)
+    task = asyncio.ensure_future(loader.load())
+
+    dfs = await loader.wait_catalog("RelationshipGraph")   # {'df_tables': ...}
+    file_report = await task                               # FileMakerXMLReportParser
+
+    loader.cancel()                                        # or task.cancel()
+
+    If the load fails or is cancelled, wait_catalog raises the load error (or
+    CancelledError) for catalogs not published yet.
+
+
+    * Callbacks (called in the event loop thread):
+    ----------------------------------------------------------------------------
+    - on_progress(progress)       progress -> {'bytes_read': int, 'total_bytes': int,
+                                               'objects': {catalog: int}}
+    - on_catalog(catalog, dfs)    dfs      -> {'df_tables': pd.DataFrame, ...}
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    # Catalog objects parsed between cancellation checks
+    BATCH_SIZE = 1000
+
+    def __init__(self, xml_file, on_progress=None, on_catalog=None, chunk_size=CHUNK_SIZE, columns=None):
+
+        self.xml_file = xml_file
+        self.on_progress = on_progress
+        self.on_catalog = on_catalog
+        self.chunk_size = chunk_size
+
+        # Columns projection {catalog: [XML attributes]} (see FileMakerXMLReportParser)
+        self.columns = columns or {}
+
+        # Published DataFrames {'df_tables': df_tables, ...}
+        self.frames = {}
+
+        self.progress = {
+            'bytes_read': 0,
+            'total_bytes': os.path.getsize(xml_file),
+            'objects': dict.fromkeys(FileMakerXMLReportParser.CATALOG_FRAMES, 0),
+        }
+
+        self._ready = {}
+        self._cancelled = threading.Event()
+
+        # Load error (or CancelledError), raised by wait_catalog
+        self._error = None
+
+    def _ready_event(self, catalog: str) -> asyncio.Event:
+        if catalog not in self._ready:
+            self._ready[catalog] = asyncio.Event()
+
+        return self._ready[catalog]
+
+    def cancel(self):
+        """Stops the worker thread at the next chunk or batch of catalog objects (load raises CancelledError)"""
+        self._cancelled.set()
+
+    async def wait_catalog(self, catalog: str) -> dict:
+        """Waits until catalog is parsed and returns its DataFrames"""
+
+        if catalog not in FileMakerXMLReportParser.CATALOG_FRAMES:
+            raise KeyError(f"Unknown catalog: {catalog}")
+
+        await self._ready_event(catalog).wait()
+
+        attrs = FileMakerXMLReportParser.CATALOG_FRAMES[catalog][1]
+
+        # Woken up by a failed/cancelled load
+        if not all(attr in self.frames for attr in attrs):
+            if isinstance(self._error, asyncio.CancelledError):
+                raise asyncio.CancelledError()
+            raise self._error
+
+        return {attr: self.frames[attr] for attr in attrs}
+
+    async def load(self) -> FileMakerXMLReportParser:
+        """Parses xml_file in a worker thread and returns the parser instance"""
+
+        loop = asyncio.get_running_loop()
+
+        for catalog in FileMakerXMLReportParser.CATALOG_FRAMES:
+            self._ready_event(catalog)
+
+        try:
+            await loop.run_in_executor(None, self._parse, loop)
+        except BaseException as e:
+            self._cancelled.set()
+            self._fail(e)
+            raise
+
+        return FileMakerXMLReportParser.from_frames(self.xml_file, self.frames)
+
+    def _fail(self, error: BaseException):
+        """Records load error and wakes up every wait_catalog"""
+
+        self._error = error
+
+        for event in self._ready.values():
+            event.set()
+
+    def _publish(self, catalog: str, dfs: dict):
+        self.frames.update(dfs)
+        self._ready[catalog].set()
+
+        if self.on_catalog is not None:
+            self.on_catalog(catalog, dfs)
+
+    def _publish_progress(self, progress: dict):
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def _parse_catalog(self, loop, catalog: str, objects: List[ET.Element]):
+        """Parses catalog objects in batches (worker thread) and publishes its DataFrames"""
+
+        batches = [objects[i:i + self.BATCH_SIZE] for i in range(0, len(objects), self.BATCH_SIZE)] or [[]]
+        batches_dfs = []
+
+        for batch in batches:
+            if self._cancelled.is_set():
+                raise asyncio.CancelledError()
+
+            root = ET.Element("FMPReport")
+            ET.SubElement(root, "File").append(FileMakerXMLReportParser._catalog_element(catalog, batch))
+
+            batches_dfs.append(
+                FileMakerXMLReportParser.parse_catalog_frames(catalog, root, self.columns.get(catalog)))
+
+        if len(batches_dfs) == 1:
+            dfs = batches_dfs[0]
+        else:
+            dfs = {
+                attr: _concat_batches([batch_dfs[attr] for batch_dfs in batches_dfs])
+                for attr in batches_dfs[0]
+            }
+
+        loop.call_soon_threadsafe(self._publish, catalog, dfs)
+
+    def _parse(self, loop):
+        """Worker thread: pull parses xml_file chunks"""
+
+        catalogs = FileMakerXMLReportParser.CATALOG_FRAMES
+        containers = {'FMPReport', 'File', 'Group', 'TableList', 'RelationshipList', *catalogs}
+
+        # {object tag: catalog}
+        object_tags = {
+            tag: catalog
+            for catalog, tags in FileMakerXMLReportParser.PREVIEW_CATALOGS.items()
+            for tag in tags
+        }
+
+        parser = ET.XMLPullParser(events=('end',))
+        objects = self.progress['objects']
+        pending = set(catalogs)
+
+        # Top-level objects of each catalog {catalog: [el]}
+        catalog_objects = {}
+
+        with open(self.xml_file, 'rb') as f:
+            while True:
+                if self._cancelled.is_set():
+                    raise asyncio.CancelledError()
+
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+
+                parser.feed(chunk)
+                self.progress['bytes_read'] += len(chunk)
+
+                for _, el in parser.read_events():
+                    parent = el.getparent()
+
+                    # File catalogs
+                    if parent is not None and parent.tag == 'File':
+                        parent.remove(el)
+
+                        if el.tag in pending:
+                            pending.discard(el.tag)
+                            self._parse_catalog(loop, el.tag, catalog_objects.pop(el.tag, []))
+
+                    # Catalog objects
+                    elif el.tag in object_tags and all(a.tag in containers for a in el.iterancestors()):
+                        objects[object_tags[el.tag]] += 1
+                        catalog_objects.setdefault(object_tags[el.tag], []).append(el)
+
+                progress = {**self.progress, 'objects': dict(objects)}
+                loop.call_soon_threadsafe(self._publish_progress, progress)
+
+        parser.close()
+
+        # Empty DataFrames for catalogs not found in file
+        for catalog in pending:
+            self._parse_catalog(loop, catalog, [])
+
+
+class FileMakerXMLReportRegistry:
+    """Thread-safe registry of parsed DDRs with LRU eviction by memory budget
+
+    Models are loaded on demand by path (one shared load for concurrent requests
+    of the same file) and reloaded when the file changes. When the df_* memory
+    of loaded models exceeds max_memory, least recently used models are evicted
+    (the last requested model is always kept).
+
+    * Usage:
+    ----------------------------------------------------------------------------
+    registry = FileMakerXMLReportRegistry(max_memory=4 * 1024 ** 3, columns={'ScriptCatalog': []})
+
+    file_report = registry.get("path/to/file.xml")
+    registry.stats  # {'hits': 1, 'misses': 1, 'shared': 0, 'evictions': 0, 'models': 1, 'memory': ...}
+    """
+
+    def __init__(self, max_memory=2 * 1024 ** 3, **parser_kwargs):
+
+        self.max_memory = max_memory
+
+        # FileMakerXMLReportParser arguments (preview, columns...)
+        self.parser_kwargs = parser_kwargs
+
+        # {path: (parser, memory, mtime)} least recently used first
+        self._models = OrderedDict()
+
+        # {path: Future} loads in progress
+        self._loading = {}
+
+        self._lock = threading.Lock()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'shared': self._shared,
+                'evictions': self._evictions,
+                'models': len(self._models),
+                'memory': self._memory,
+            }
+
+    def get(self, xml_file) -> FileMakerXMLReportParser:
+        """Returns the parser of xml_file, loading it if needed"""
+
+        path = os.path.abspath(xml_file)
+        mtime = os.path.getmtime(path)
+
+        # This request loads the model
+        owner = False
+
+        with self._lock:
+            model = self._models.get(path)
+
+            if model is not None and model[2] == mtime:
+                self._models.move_to_end(path)
+                self._hits += 1
+                return model[0]
+
+            # Outdated model
+            if model is not None:
+                self._remove(path)
+
+            future = self._loading.get(path)
+            if future is not None:
+                self._shared += 1
+            else:
+                future = self._loading[path] = Future()
+                self._misses += 1
+                owner = True
+
+        # Wait for the load of another request
+        if not owner:
+            return future.result()
+
+        try:
+            parser = FileMakerXMLReportParser(path, **self.parser_kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[path]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[path]
+            self._add(path, parser, mtime)
+
+        future.set_result(parser)
+
+        return parser
+
+    def evict(self, xml_file):
+        """Removes xml_file model from registry"""
+
+        with self._lock:
+            self._remove(os.path.abspath(xml_file))
+
+    def clear(self):
+        """Removes all models from registry"""
+
+        with self._lock:
+            self._models.clear()
+            self._memory = 0
+
+    def _add(self, path: str, parser: FileMakerXMLReportParser, mtime: float):
+        memory = parser.memory_usage()
+
+        self._models[path] = (parser, memory, mtime)
+        self._memory += memory
+
+        # Evict least recently used models (keeps the added one)
+        while self._memory > self.max_memory and len(self._models) > 1:
+            _, (_, evicted_memory, _) = self._models.popitem(last=False)
+            self._memory -= evicted_memory
+            self._evictions += 1
+
+    def _remove(self, path: str):
+        model = self._models.pop(path, None)
+        if model is not None:
+            self._memory -= model[1]